@@ -60,6 +60,9 @@ class CausalConv3d(nn.Module):
         self.padding = kwargs.pop("padding", 0)
         self.padding = list(cast_tuple(self.padding, 3))
         self.padding[0] = 0
+        # Asymmetric (left, right, top, bottom) spatial padding applied inside
+        # forward, so callers don't need a separate F.pad pass.
+        self.spatial_pad = kwargs.pop("spatial_pad", None)
         self.stride = cast_tuple(self.stride, 3)
         self.conv = nn.Conv3d(
             chan_in,
@@ -69,6 +72,8 @@ class CausalConv3d(nn.Module):
             padding=self.padding,
             bias=bias
         )
+        # Keep conv weights in NDHWC so cuDNN can pick tensor-core kernels.
+        self.conv = self.conv.to(memory_format=torch.channels_last_3d)
         self.enable_cached = enable_cached
         
         self.is_first_chunk = True
@@ -76,27 +81,83 @@ class CausalConv3d(nn.Module):
         self.causal_cached = deque()
         self.cache_offset = 0
 
+    def _forward_2d(self, x):
+        # A (1, kh, kw) kernel does per-frame work only, so fold time into
+        # the batch and run the much faster Conv2d kernels.
+        b, c, t, h, w = x.shape
+        x = x.permute(0, 2, 1, 3, 4).reshape(b * t, c, h, w)
+        weight = self.conv.weight.squeeze(2)
+        padding = (self.padding[1], self.padding[2])
+        if self.spatial_pad is not None:
+            if (
+                self.spatial_pad == (0, 1, 0, 1)
+                and self.kernel_size[1] == 3
+                and self.kernel_size[2] == 3
+            ):
+                weight = F.pad(weight, (1, 0, 1, 0))
+                padding = (1, 1)
+            else:
+                x = F.pad(x, self.spatial_pad)
+        x = F.conv2d(
+            x,
+            weight,
+            self.conv.bias,
+            stride=(self.stride[1], self.stride[2]),
+            padding=padding,
+        )
+        return x.reshape(b, t, x.shape[1], x.shape[2], x.shape[3]).permute(
+            0, 2, 1, 3, 4
+        )
+
     def forward(self, x):
-        if self.is_first_chunk:
-            first_frame_pad = x[:, :, :1, :, :].repeat(
-                (1, 1, self.time_kernel_size - 1, 1, 1)
-            )
-        else:
-            first_frame_pad = self.causal_cached.popleft()
-            
-        x = torch.concatenate((first_frame_pad, x), dim=2)
+        if self.time_kernel_size != 1:
+            if self.is_first_chunk:
+                # expand is a zero-copy view; the concat below does the
+                # single combined copy.
+                first_frame_pad = x[:, :, :1, :, :].expand(
+                    -1, -1, self.time_kernel_size - 1, -1, -1
+                )
+            else:
+                first_frame_pad = self.causal_cached.popleft()
+
+            x = torch.concatenate((first_frame_pad, x), dim=2)
 
-        if self.enable_cached and self.time_kernel_size != 1:
-            if (self.time_kernel_size - 1) // self.stride[0] != 0:
-                if self.cache_offset == 0 or self.is_first_chunk:
-                    self.causal_cached.append(x[:, :, -(self.time_kernel_size - 1) // self.stride[0]:].clone())
+            if self.enable_cached:
+                if (self.time_kernel_size - 1) // self.stride[0] != 0:
+                    if self.cache_offset == 0 or self.is_first_chunk:
+                        self.causal_cached.append(x[:, :, -(self.time_kernel_size - 1) // self.stride[0]:].clone())
+                    else:
+                        self.causal_cached.append(x[:, :, :-self.cache_offset][:, :, -(self.time_kernel_size - 1) // self.stride[0]:].clone())
                 else:
-                    self.causal_cached.append(x[:, :, :-self.cache_offset][:, :, -(self.time_kernel_size - 1) // self.stride[0]:].clone())
-            else:
+                    self.causal_cached.append(x[:, :, 0:0, :, :].clone())
+        else:
+            if not self.is_first_chunk:
+                self.causal_cached.popleft()
+            if self.enable_cached:
                 self.causal_cached.append(x[:, :, 0:0, :, :].clone())
-        elif self.enable_cached:
-            self.causal_cached.append(x[:, :, 0:0, :, :].clone())
-            
+            if self.stride[0] == 1:
+                return self._forward_2d(x)
+
+        if self.spatial_pad is not None:
+            if (
+                self.spatial_pad == (0, 1, 0, 1)
+                and self.kernel_size[1] == 3
+                and self.kernel_size[2] == 3
+            ):
+                # Fold the right/bottom zero pad into the conv: embed the
+                # 3x3 taps in the lower-right of a 4x4 kernel and use
+                # symmetric implicit padding. Window for window this
+                # matches pad-then-conv, without materializing a padded
+                # copy of the activation.
+                weight = F.pad(self.conv.weight, (1, 0, 1, 0))
+                return F.conv3d(
+                    x,
+                    weight,
+                    self.conv.bias,
+                    stride=self.stride,
+                    padding=(self.padding[0], 1, 1),
+                )
+            x = F.pad(x, self.spatial_pad)
         x = self.conv(x)
         return x
 
@@ -113,8 +174,8 @@ class CausalConv3d_GC(CausalConv3d):
 
     def forward(self, x):
         # 1 + 16   16 as video, 1 as image
-        first_frame_pad = x[:, :, :1, :, :].repeat(
-            (1, 1, self.time_kernel_size - 1, 1, 1)
+        first_frame_pad = x[:, :, :1, :, :].expand(
+            -1, -1, self.time_kernel_size - 1, -1, -1
         )  # b c t h w
         x = torch.concatenate((first_frame_pad, x), dim=2)  # 3 + 16
         return checkpoint(self.conv, x)
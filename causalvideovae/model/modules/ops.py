@@ -1,4 +1,5 @@
 import torch
+import torch.nn.functional as F
 from einops import rearrange
 
 def video_to_image(func):
@@ -14,7 +15,9 @@ def video_to_image(func):
     return wrapper
 
 def nonlinearity(x):
-    return x * torch.sigmoid(x)
+    # Single fused SiLU kernel; x * sigmoid(x) launches two and
+    # materializes the sigmoid intermediate.
+    return F.silu(x)
 
 def cast_tuple(t, length=1):
     return t if isinstance(t, tuple) or isinstance(t, list) else ((t,) * length)
@@ -20,6 +20,7 @@ class ResnetBlock2D(nn.Module):
         self.in_channels = in_channels
         self.out_channels = in_channels if out_channels is None else out_channels
         self.use_conv_shortcut = conv_shortcut
+        self.gradient_checkpointing = False
 
         self.norm1 = Normalize(in_channels, norm_type=norm_type)
         self.conv1 = torch.nn.Conv2d(
@@ -42,6 +43,11 @@ class ResnetBlock2D(nn.Module):
 
     @video_to_image
     def forward(self, x):
+        if self.gradient_checkpointing and self.training:
+            return checkpoint(self._forward, x, use_reentrant=False)
+        return self._forward(x)
+
+    def _forward(self, x):
         h = x
         h = self.norm1(h)
         h = nonlinearity(h)
@@ -57,7 +63,7 @@ class ResnetBlock2D(nn.Module):
                 x = self.nin_shortcut(x)
         x = x + h
         return x
-    
+
 class ResnetBlock3D(nn.Module):
     def __init__(
         self,
@@ -72,6 +78,7 @@ class ResnetBlock3D(nn.Module):
         self.in_channels = in_channels
         self.out_channels = in_channels if out_channels is None else out_channels
         self.use_conv_shortcut = conv_shortcut
+        self.gradient_checkpointing = False
 
         self.norm1 = Normalize(in_channels, norm_type=norm_type)
         self.conv1 = CausalConv3d(in_channels, out_channels, 3, padding=1)
@@ -89,6 +96,11 @@ class ResnetBlock3D(nn.Module):
                 )
 
     def forward(self, x):
+        if self.gradient_checkpointing and self.training:
+            return checkpoint(self._forward, x, use_reentrant=False)
+        return self._forward(x)
+
+    def _forward(self, x):
         h = x
         h = self.norm1(h)
         h = nonlinearity(h)
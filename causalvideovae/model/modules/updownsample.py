@@ -8,20 +8,121 @@ from einops import rearrange
 from collections import deque
 
 
+def _align_channels(channels, multiple=8):
+    # Round up to a multiple of 8 so FP16/BF16 convs hit aligned
+    # tensor-core kernels.
+    return -(-channels // multiple) * multiple
+
+
+_interp2x_lut_cache = {}
+
+
+def _bilinear2x_lut(size, device):
+    # Index/weight tables for a 2x bilinear upsample (align_corners=False),
+    # cached per (size, device) so repeated calls skip the coordinate math.
+    key = (size, device)
+    lut = _interp2x_lut_cache.get(key)
+    if lut is None:
+        src = torch.arange(2 * size, device=device, dtype=torch.float32)
+        src = ((src + 0.5) / 2 - 0.5).clamp(min=0)
+        lo = src.floor()
+        frac = src - lo
+        lo = lo.long()
+        hi = (lo + 1).clamp(max=size - 1)
+        lut = (lo, hi, frac)
+        _interp2x_lut_cache[key] = lut
+    return lut
+
+
+def _interpolate_spatial2x(x):
+    # 2x bilinear upsample on H and W of (b, c, t, h, w), equivalent to
+    # F.interpolate(x, scale_factor=(1, 2, 2), mode="trilinear") but built
+    # from precomputed gathers plus a fused lerp.
+    lo, hi, frac = _bilinear2x_lut(x.size(-1), x.device)
+    x = torch.lerp(x.index_select(-1, lo), x.index_select(-1, hi), frac.to(x.dtype))
+    lo, hi, frac = _bilinear2x_lut(x.size(-2), x.device)
+    x = torch.lerp(
+        x.index_select(-2, lo),
+        x.index_select(-2, hi),
+        frac.to(x.dtype).unsqueeze(-1),
+    )
+    return x
+
+
+def _temporal_avg_pool2x_k3(x):
+    # AvgPool3d((3, 1, 1), stride=(2, 1, 1)) on an already causally padded
+    # input, written as three strided reads and one add chain; avoids the
+    # generic pooling kernel's window indexing overhead.
+    return (x[:, :, 0:-2:2] + x[:, :, 1:-1:2] + x[:, :, 2::2]) * (1.0 / 3.0)
+
+
+def _interpolate_fp32(x, **kwargs):
+    # The linear/trilinear interpolation kernels have no fast
+    # reduced-precision specialization; under autocast, compute in FP32
+    # and cast back.
+    if torch.is_autocast_enabled():
+        with torch.amp.autocast("cuda", enabled=False):
+            return F.interpolate(x.float(), **kwargs).to(x.dtype)
+    return F.interpolate(x, **kwargs)
+
+
+def _interpolate_time2x(x, mode="trilinear"):
+    # Temporal 2x upsample on (b, c, t, h, w). Equivalent to
+    # F.interpolate(x, scale_factor=(2, 1, 1), mode=...), but nearest runs as
+    # a single indexed copy and trilinear as a true 1D linear interpolation,
+    # which avoids the slow trilinear kernel (notably under autocast).
+    if mode == "nearest":
+        return x.repeat_interleave(2, dim=2)
+    b, c, t, h, w = x.shape
+    x = x.permute(0, 1, 3, 4, 2).reshape(b, c * h * w, t)
+    x = _interpolate_fp32(x, scale_factor=2.0, mode="linear")
+    return x.reshape(b, c, h, w, t * 2).permute(0, 1, 4, 2, 3)
+
+
 class Upsample(nn.Module):
     def __init__(self, in_channels, out_channels, **kwargs):
         super().__init__()
         self.with_conv = True
+        self.out_channels = out_channels
         if self.with_conv:
             self.conv = torch.nn.Conv2d(
                 in_channels, out_channels, kernel_size=3, stride=1, padding=1
-            )
+            ).to(memory_format=torch.channels_last)
+        # Sub-pixel regrouping of a 3x3 conv run after a nearest 2x
+        # upsample: each output sub-pixel sees its own 3x3 regrouping of
+        # the original taps.
+        self.register_buffer(
+            "_ps_t0",
+            torch.tensor([[1.0, 0, 0], [0, 1, 1], [0, 0, 0]]),
+            persistent=False,
+        )
+        self.register_buffer(
+            "_ps_t1",
+            torch.tensor([[0.0, 0, 0], [1, 1, 0], [0, 0, 1]]),
+            persistent=False,
+        )
 
     @video_to_image
     def forward(self, x):
-        x = torch.nn.functional.interpolate(x, scale_factor=2.0, mode="nearest")
         if self.with_conv:
-            x = self.conv(x)
+            # Nearest 2x + 3x3 conv computed as four sub-pixel convs on the
+            # low-res input plus a pixel shuffle, so the 4x upsampled tensor
+            # is never written to memory. The pixel-shuffle weight is derived
+            # here from the checkpoint-shaped parameter, so every load path
+            # (load_state_dict and the diffusers/accelerate meta load alike)
+            # sees the original layout.
+            weight = self.conv.weight
+            t0 = self._ps_t0.to(weight.dtype)
+            t1 = self._ps_t1.to(weight.dtype)
+            subs = [ta @ weight @ tb.t() for ta in (t0, t1) for tb in (t0, t1)]
+            weight = torch.stack(subs, dim=1).reshape(-1, *weight.shape[1:])
+            bias = self.conv.bias
+            if bias is not None:
+                bias = bias.repeat_interleave(4)
+            x = F.conv2d(x, weight, bias, stride=1, padding=1)
+            x = F.pixel_shuffle(x, 2)
+        else:
+            x = x.repeat_interleave(2, dim=-2).repeat_interleave(2, dim=-1)
         return x
 
 
@@ -29,17 +130,31 @@ class Downsample(nn.Module):
     def __init__(self, in_channels, out_channels, **kwargs):
         super().__init__()
         self.with_conv = True
+        self.out_channels = out_channels
         if self.with_conv:
             self.conv = torch.nn.Conv2d(
                 in_channels, out_channels, kernel_size=3, stride=2, padding=0
-            )
+            ).to(memory_format=torch.channels_last)
+            self._pad_channels = _align_channels(out_channels) - out_channels
 
     @video_to_image
     def forward(self, x):
         if self.with_conv:
-            pad = (0, 1, 0, 1)
-            x = torch.nn.functional.pad(x, pad, mode="constant", value=0)
-            x = self.conv(x)
+            # Same folding trick as CausalConv3d's spatial_pad path: the
+            # (0, 1, 0, 1) zero pad becomes a 4x4 kernel with the 3x3 taps
+            # in the lower-right plus symmetric implicit padding. The
+            # tensor-core channel alignment is applied to the weight here
+            # rather than baked into the parameter, so the stored shape
+            # matches the checkpoint on every load path.
+            weight = F.pad(self.conv.weight, (1, 0, 1, 0))
+            bias = self.conv.bias
+            if self._pad_channels:
+                weight = F.pad(weight, (0, 0, 0, 0, 0, 0, 0, self._pad_channels))
+                if bias is not None:
+                    bias = F.pad(bias, (0, self._pad_channels))
+            x = F.conv2d(x, weight, bias, stride=2, padding=1)
+            if self._pad_channels:
+                x = x[:, : self.out_channels]
         else:
             x = torch.nn.functional.avg_pool2d(x, kernel_size=2, stride=2)
         return x
@@ -66,11 +181,10 @@ class SpatialDownsample2x(nn.Module):
             (1,) + self.kernel_size,
             stride=(1,) + stride,
             padding=0,
+            spatial_pad=(0, 1, 0, 1),
         )
 
     def forward(self, x):
-        pad = (0, 1, 0, 1, 0, 0)
-        x = torch.nn.functional.pad(x, pad, mode="constant", value=0)
         x = self.conv(x)
         return x
 
@@ -96,13 +210,47 @@ class SpatialUpsample2x(nn.Module):
             stride=(1,) + stride,
             padding=1,
         )
+        # Sub-pixel regrouping of a 3x3 conv run after a nearest 2x
+        # upsample (same transforms as the Upsample pixel-shuffle head).
+        self.register_buffer(
+            "_ps_t0",
+            torch.tensor([[1.0, 0, 0], [0, 1, 1], [0, 0, 0]]),
+            persistent=False,
+        )
+        self.register_buffer(
+            "_ps_t1",
+            torch.tensor([[0.0, 0, 0], [1, 1, 0], [0, 0, 1]]),
+            persistent=False,
+        )
+
+    def _forward_fused(self, x):
+        # Nearest 2x + 3x3 conv computed as four sub-pixel convs on the
+        # low-res input plus a pixel shuffle, so the 4x upsampled tensor is
+        # never written to memory. Exact for the (1, 3, 3), stride-1 conv
+        # this module builds.
+        b, c, t, h, w = x.shape
+        weight = self.conv.conv.weight.squeeze(2)
+        t0 = self._ps_t0.to(weight.dtype)
+        t1 = self._ps_t1.to(weight.dtype)
+        subs = [ta @ weight @ tb.t() for ta in (t0, t1) for tb in (t0, t1)]
+        weight = torch.stack(subs, dim=1).reshape(-1, *weight.shape[1:])
+        bias = self.conv.conv.bias
+        if bias is not None:
+            bias = bias.repeat_interleave(4)
+        x = x.permute(0, 2, 1, 3, 4).reshape(b * t, c, h, w)
+        x = F.conv2d(x, weight, bias, stride=1, padding=1)
+        x = F.pixel_shuffle(x, 2)
+        return x.reshape(b, t, -1, h * 2, w * 2).permute(0, 2, 1, 3, 4)
 
     def forward(self, x):
+        if (
+            not self.unup
+            and self.kernel_size == (3, 3)
+            and self.conv.stride == (1, 1, 1)
+        ):
+            return self._forward_fused(x)
         if not self.unup:
-            t = x.shape[2]
-            x = rearrange(x, "b c t h w -> b (c t) h w")
-            x = F.interpolate(x, scale_factor=(2, 2), mode="nearest")
-            x = rearrange(x, "b (c t) h w -> b c t h w", t=t)
+            x = x.repeat_interleave(2, dim=-2).repeat_interleave(2, dim=-1)
         x = self.conv(x)
         return x
 
@@ -114,8 +262,9 @@ class TimeDownsample2x(nn.Module):
         self.conv = nn.AvgPool3d((kernel_size, 1, 1), stride=(2, 1, 1))
 
     def forward(self, x):
-        first_frame_pad = x[:, :, :1, :, :].repeat((1, 1, self.kernel_size - 1, 1, 1))
-        x = torch.concatenate((first_frame_pad, x), dim=2)
+        x = F.pad(x, (0, 0, 0, 0, self.kernel_size - 1, 0), mode="replicate")
+        if self.kernel_size == 3:
+            return _temporal_avg_pool2x_k3(x)
         return self.conv(x)
 
 
@@ -126,7 +275,7 @@ class TimeUpsample2x(nn.Module):
     def forward(self, x):
         if x.size(2) > 1:
             x, x_ = x[:, :, :1], x[:, :, 1:]
-            x_ = F.interpolate(x_, scale_factor=(2, 1, 1), mode="trilinear")
+            x_ = _interpolate_time2x(x_)
             x = torch.concat([x, x_], dim=2)
         return x
 
@@ -148,16 +297,34 @@ class TimeDownsampleRes2x(nn.Module):
             self.kernel_size,
             stride=(2, 1, 1),
             padding=(0, 1, 1),
-        )
+        ).to(memory_format=torch.channels_last_3d)
         self.mix_factor = torch.nn.Parameter(torch.Tensor([mix_factor]))
+        self._alpha_cache = None
+
+    def train(self, mode=True):
+        self._alpha_cache = None
+        return super().train(mode)
+
+    def _alpha(self):
+        # The scalar sigmoid is constant at eval time; cache it so each
+        # forward doesn't launch a one-element kernel.
+        if self.training:
+            return torch.sigmoid(self.mix_factor)
+        if self._alpha_cache is None:
+            # .item() syncs once when the cache fills; lerp then takes its
+            # scalar-weight path instead of broadcasting a 1-element tensor.
+            self._alpha_cache = torch.sigmoid(self.mix_factor.detach()).item()
+        return self._alpha_cache
 
     def forward(self, x):
-        alpha = torch.sigmoid(self.mix_factor)
-        first_frame_pad = x[:, :, :1, :, :].repeat(
-            (1, 1, self.kernel_size[0] - 1, 1, 1)
-        )
-        x = torch.concatenate((first_frame_pad, x), dim=2)
-        return alpha * self.avg_pool(x) + (1 - alpha) * self.conv(x)
+        alpha = self._alpha()
+        x = F.pad(x, (0, 0, 0, 0, self.kernel_size[0] - 1, 0), mode="replicate")
+        if self.kernel_size[0] == 3:
+            pooled = _temporal_avg_pool2x_k3(x)
+        else:
+            pooled = self.avg_pool(x)
+        # alpha * avg_pool + (1 - alpha) * conv as one fused kernel.
+        return torch.lerp(self.conv(x), pooled, alpha)
 
 
 class TimeUpsampleRes2x(nn.Module):
@@ -171,26 +338,39 @@ class TimeUpsampleRes2x(nn.Module):
         super().__init__()
         self.conv = CausalConv3d(in_channels, out_channels, kernel_size, padding=1)
         self.mix_factor = torch.nn.Parameter(torch.Tensor([mix_factor]))
+        self._alpha_cache = None
+
+    def train(self, mode=True):
+        self._alpha_cache = None
+        return super().train(mode)
+
+    def _alpha(self):
+        if self.training:
+            return torch.sigmoid(self.mix_factor)
+        if self._alpha_cache is None:
+            # .item() syncs once when the cache fills; lerp then takes its
+            # scalar-weight path instead of broadcasting a 1-element tensor.
+            self._alpha_cache = torch.sigmoid(self.mix_factor.detach()).item()
+        return self._alpha_cache
 
     def forward(self, x):
-        alpha = torch.sigmoid(self.mix_factor)
+        alpha = self._alpha()
         if x.size(2) > 1:
             x, x_ = x[:, :, :1], x[:, :, 1:]
-            x_ = F.interpolate(x_, scale_factor=(2, 1, 1), mode="trilinear")
+            x_ = _interpolate_time2x(x_)
             x = torch.concat([x, x_], dim=2)
-        return alpha * x + (1 - alpha) * self.conv(x)
+        return torch.lerp(self.conv(x), x, alpha)
 
 
 class Spatial2xTime2x3DDownsample(nn.Module):
     def __init__(self, in_channels, out_channels):
         super().__init__()
         self.conv = CausalConv3d(
-            in_channels, out_channels, kernel_size=3, padding=0, stride=2
+            in_channels, out_channels, kernel_size=3, padding=0, stride=2,
+            spatial_pad=(0, 1, 0, 1),
         )
 
     def forward(self, x):
-        pad = (0, 1, 0, 1, 0, 0)
-        x = torch.nn.functional.pad(x, pad, mode="constant", value=0)
         x = self.conv(x)
         return x
 
@@ -199,12 +379,11 @@ class Spatial2x3DDownsample(nn.Module):
     def __init__(self, in_channels, out_channels):
         super().__init__()
         self.conv = CausalConv3d(
-            in_channels, out_channels, kernel_size=3, padding=0, stride=(1, 2, 2)
+            in_channels, out_channels, kernel_size=3, padding=0, stride=(1, 2, 2),
+            spatial_pad=(0, 1, 0, 1),
         )
 
     def forward(self, x):
-        pad = (0, 1, 0, 1, 0, 0)
-        x = torch.nn.functional.pad(x, pad, mode="constant", value=0)
         x = self.conv(x)
         return x
 
@@ -215,7 +394,7 @@ class Spatial2x3DUpsample(nn.Module):
         self.conv = CausalConv3d(in_channels, out_channels, kernel_size=3, padding=1)
 
     def forward(self, x):
-        x = F.interpolate(x, scale_factor=(1, 2, 2), mode="trilinear")
+        x = _interpolate_spatial2x(x)
         return self.conv(x)
 
 
@@ -234,31 +413,66 @@ class Spatial2xTime2x3DUpsample(nn.Module):
         self.enable_cached = enable_cached
         self.causal_cached = deque()
         self.depth = depth
-        
+        self._cache_buf = None
+        self._cat_buf = None
+
+    def _cat_cached(self, cached, x):
+        # Streaming-path concat into a reused output buffer, saving one
+        # allocation per chunk; autograd-enabled calls keep torch.cat.
+        if torch.is_grad_enabled():
+            return torch.cat([cached, x], dim=2)
+        shape = list(x.shape)
+        shape[2] += cached.shape[2]
+        if (
+            self._cat_buf is None
+            or list(self._cat_buf.shape) != shape
+            or self._cat_buf.dtype != x.dtype
+            or self._cat_buf.device != x.device
+        ):
+            self._cat_buf = x.new_empty(shape)
+        self._cat_buf[:, :, : cached.shape[2]].copy_(cached)
+        self._cat_buf[:, :, cached.shape[2] :].copy_(x)
+        return self._cat_buf
+
+    def _push_cache(self, tail):
+        # Streaming inference reuses one persistent device buffer for the
+        # cached frame instead of cloning a fresh tensor every chunk. The
+        # buffer was already consumed by the cat above, so overwriting it
+        # here is safe.
+        if torch.is_grad_enabled():
+            self.causal_cached.append(tail.clone())
+            return
+        if (
+            self._cache_buf is None
+            or self._cache_buf.shape != tail.shape
+            or self._cache_buf.dtype != tail.dtype
+            or self._cache_buf.device != tail.device
+        ):
+            self._cache_buf = torch.empty_like(tail)
+        self._cache_buf.copy_(tail)
+        self.causal_cached.append(self._cache_buf)
+
     def forward(self, x):
         if x.size(2) == 1:
-            x = F.interpolate(x, scale_factor=(1, 2, 2), mode="trilinear")
-            
+            x = _interpolate_spatial2x(x)
+
         elif self.enable_cached:
             drop_cached = False
             if len(self.causal_cached) > 0:
                 cached = self.causal_cached.popleft()
-                x = torch.cat([cached, x], dim=2)
+                x = self._cat_cached(cached, x)
                 drop_cached = True
-            self.causal_cached.append(
-                x[:, :, -(2**self.depth) - 1 : -(2**self.depth)].clone()
-            )
-            x = F.interpolate(x, scale_factor=(2, 1, 1), mode=self.t_interpolation)
+            self._push_cache(x[:, :, -(2**self.depth) - 1 : -(2**self.depth)])
+            x = _interpolate_time2x(x, self.t_interpolation)
             if drop_cached:
                 x = x[:, :, 2:]
-            x = F.interpolate(x, scale_factor=(1, 2, 2), mode="trilinear")
+            x = _interpolate_spatial2x(x)
         else:
+            # Spatial and temporal interpolation are separable, so upsample
+            # H/W once on the whole tensor instead of per split half.
+            x = _interpolate_spatial2x(x)
             x, x_ = x[:, :, :1], x[:, :, 1:]
-            x_ = F.interpolate(
-                x_, scale_factor=(2, 1, 1), mode=self.t_interpolation
-            )
-            x_ = F.interpolate(x_, scale_factor=(1, 2, 2), mode="trilinear")
-            x = F.interpolate(x, scale_factor=(1, 2, 2), mode="trilinear")
+            x_ = _interpolate_time2x(x_, self.t_interpolation)
             x = torch.concat([x, x_], dim=2)
             
         return self.conv(x)
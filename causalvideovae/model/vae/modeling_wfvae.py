@@ -1,4 +1,5 @@
 from typing import Any, List
+import contextlib
 import torch
 import torch.nn as nn
 import os
@@ -122,16 +123,38 @@ class Encoder(VideoBaseAE):
         self.wavelet_transform_l1 = resolve_str_to_obj(l1_downsample_wavelet)()
         self.wavelet_transform_l2 = resolve_str_to_obj(l2_downsample_wavelet)()
 
+        # Side stream for the energy-flow branch; created lazily so the
+        # model can be built without CUDA.
+        self._side_stream = None
+
     def forward(self, x):
         coeffs = self.wavelet_transform_in(x)
 
-        l1_coeffs = coeffs[:, :3]
-        l1_coeffs = self.wavelet_transform_l1(l1_coeffs)
-        l1 = self.connect_l1(l1_coeffs)
-        l2_coeffs = self.wavelet_transform_l2(l1_coeffs[:, :3])
-        l2 = self.connect_l2(l2_coeffs)
+        def _energy_flow():
+            l1_coeffs = self.wavelet_transform_l1(coeffs[:, :3])
+            l1 = self.connect_l1(l1_coeffs)
+            l2_coeffs = self.wavelet_transform_l2(l1_coeffs[:, :3])
+            l2 = self.connect_l2(l2_coeffs)
+            return l1_coeffs, l1, l2_coeffs, l2
+
+        if coeffs.is_cuda and not torch.is_grad_enabled():
+            # The energy-flow branch only reads coeffs, so it can run on a
+            # side stream while down1 occupies the default stream.
+            if self._side_stream is None:
+                self._side_stream = torch.cuda.Stream()
+            cur = torch.cuda.current_stream()
+            self._side_stream.wait_stream(cur)
+            coeffs.record_stream(self._side_stream)
+            with torch.cuda.stream(self._side_stream):
+                l1_coeffs, l1, l2_coeffs, l2 = _energy_flow()
+            h = self.down1(coeffs)
+            cur.wait_stream(self._side_stream)
+            for side_out in (l1_coeffs, l1, l2_coeffs, l2):
+                side_out.record_stream(cur)
+        else:
+            l1_coeffs, l1, l2_coeffs, l2 = _energy_flow()
+            h = self.down1(coeffs)
 
-        h = self.down1(coeffs)
         h = torch.concat([h, l1], dim=1)
         h = self.down2(h)
         h = torch.concat([h, l2], dim=1)
@@ -288,27 +311,63 @@ class Decoder(VideoBaseAE):
         self.inverse_wavelet_transform_l1 = resolve_str_to_obj(l1_upsample_wavelet)()
         self.inverse_wavelet_transform_l2 = resolve_str_to_obj(l2_upsample_wavelet)()
 
+        # Side stream for the energy-flow branches; created lazily so the
+        # model can be built without CUDA.
+        self._side_stream = None
+
     def forward(self, z):
         h = self.conv_in(z)
         h = self.mid(h)
 
-        l2_coeffs = self.connect_l2(h[:, -self.energy_flow_hidden_size :])
-        l2 = self.inverse_wavelet_transform_l2(l2_coeffs)
-
-        h = self.up2(h[:, : -self.energy_flow_hidden_size])
-
-        l1_coeffs = h[:, -self.energy_flow_hidden_size :]
-        l1_coeffs = self.connect_l1(l1_coeffs)
-        l1_coeffs[:, :3] = l1_coeffs[:, :3] + l2
-        l1 = self.inverse_wavelet_transform_l1(l1_coeffs)
-
-        h = self.up1(h[:, : -self.energy_flow_hidden_size])
+        def _energy_flow_l2(h):
+            l2_coeffs = self.connect_l2(h[:, -self.energy_flow_hidden_size :])
+            return l2_coeffs, self.inverse_wavelet_transform_l2(l2_coeffs)
+
+        def _energy_flow_l1(h):
+            l1_coeffs = self.connect_l1(h[:, -self.energy_flow_hidden_size :])
+            # Out-of-place so Inductor can keep the surrounding ops in one
+            # fusion group; inplace slice writes get functionalized into a
+            # fusion-blocking copy_.
+            l1_coeffs = torch.cat([l1_coeffs[:, :3] + l2, l1_coeffs[:, 3:]], dim=1)
+            return l1_coeffs, self.inverse_wavelet_transform_l1(l1_coeffs)
+
+        use_side_stream = h.is_cuda and not torch.is_grad_enabled()
+        if use_side_stream and self._side_stream is None:
+            self._side_stream = torch.cuda.Stream()
+
+        if use_side_stream:
+            # Each energy-flow branch only reads the tensor the big
+            # upsampling stack also reads, so it can run on a side stream
+            # while up2/up1 occupy the default stream.
+            cur = torch.cuda.current_stream()
+            self._side_stream.wait_stream(cur)
+            h.record_stream(self._side_stream)
+            with torch.cuda.stream(self._side_stream):
+                l2_coeffs, l2 = _energy_flow_l2(h)
+            h = self.up2(h[:, : -self.energy_flow_hidden_size])
+            cur.wait_stream(self._side_stream)
+            l2_coeffs.record_stream(cur)
+            l2.record_stream(cur)
+
+            self._side_stream.wait_stream(cur)
+            h.record_stream(self._side_stream)
+            with torch.cuda.stream(self._side_stream):
+                l1_coeffs, l1 = _energy_flow_l1(h)
+            h = self.up1(h[:, : -self.energy_flow_hidden_size])
+            cur.wait_stream(self._side_stream)
+            l1_coeffs.record_stream(cur)
+            l1.record_stream(cur)
+        else:
+            l2_coeffs, l2 = _energy_flow_l2(h)
+            h = self.up2(h[:, : -self.energy_flow_hidden_size])
+            l1_coeffs, l1 = _energy_flow_l1(h)
+            h = self.up1(h[:, : -self.energy_flow_hidden_size])
 
         h = self.layer(h)
         h = self.norm_out(h)
         h = nonlinearity(h)
         h = self.conv_out(h)
-        h[:, :3] = h[:, :3] + l1
+        h = torch.cat([h[:, :3] + l1, h[:, 3:]], dim=1)
 
         dec = self.inverse_wavelet_transform_out(h)
         return dec, (l1_coeffs, l2_coeffs)
@@ -348,6 +407,18 @@ class WFVAEModel(VideoBaseAE):
         self.use_tiling = False
         self.use_quant_layer = False
 
+        # Optional autocast dtype for inference; weights stay FP32 and
+        # autocast downcasts per-op. Off (None) unless enabled.
+        self.inference_dtype = None
+
+        # Lazily built lists of the submodules touched by the per-forward
+        # state setters, so encode/decode don't re-walk the module tree.
+        self._state_module_lists = None
+
+        # Chunk plans are loop invariants for a fixed video length and
+        # chunk size, so they are computed once and reused per forward.
+        self._chunk_plan_cache = {}
+
         # It will auto set when tiling is enabled.
         self.t_chunk_enc = None
         self.t_chunk_dec = None
@@ -422,6 +493,38 @@ class WFVAEModel(VideoBaseAE):
             )
             self._set_cache_offset([self.decoder.up1[-2:], self.decoder.layer], 4)
 
+        self._convert_conv_memory_format()
+        self._maybe_compile()
+
+    def _convert_conv_memory_format(self):
+        # Keep all conv weights in channels-last layout so cuDNN picks the
+        # NHWC/NDHWC tensor-core kernels. Done per conv type because
+        # channels_last_3d only applies to 5D weights (Conv2d weights are 4D).
+        for module in self.modules():
+            if isinstance(module, nn.Conv3d):
+                module.to(memory_format=torch.channels_last_3d)
+            elif isinstance(module, nn.Conv2d):
+                module.to(memory_format=torch.channels_last)
+
+    def _maybe_compile(self):
+        # Opt-in Inductor compilation of the encoder/decoder forwards,
+        # controlled by WFVAE_COMPILE_LEVEL: 0=off (default), 1=dynamo only,
+        # 2=inductor (reduce-overhead), 3=max-autotune. Only the bound
+        # forwards are swapped so the module tree and checkpoint keys stay
+        # unchanged. dynamic=True avoids a recompile per chunk length.
+        level = int(os.environ.get("WFVAE_COMPILE_LEVEL", "0"))
+        if level <= 0 or not hasattr(torch, "compile"):
+            return
+        kwargs = {"fullgraph": False, "dynamic": True}
+        if level == 1:
+            kwargs["backend"] = "eager"
+        elif level == 2:
+            kwargs["mode"] = "reduce-overhead"
+        else:
+            kwargs["mode"] = "max-autotune"
+        self.encoder.forward = torch.compile(self.encoder.forward, **kwargs)
+        self.decoder.forward = torch.compile(self.decoder.forward, **kwargs)
+
     def get_encoder(self):
         if self.use_quant_layer:
             return [self.quant_conv, self.encoder]
@@ -432,52 +535,78 @@ class WFVAEModel(VideoBaseAE):
             return [self.post_quant_conv, self.decoder]
         return [self.decoder]
 
+    def _module_state_lists(self):
+        # Built on first use (after any quant layers are attached) and keyed
+        # off the attributes the setters below flip each forward.
+        if self._state_module_lists is None:
+            self._state_module_lists = {
+                "causal_cached": {},
+                "enable_cached": [
+                    m for m in self.modules() if hasattr(m, "enable_cached")
+                ],
+                "is_first_chunk": [
+                    m for m in self.modules() if hasattr(m, "is_first_chunk")
+                ],
+            }
+        return self._state_module_lists
+
     def _empty_causal_cached(self, parent):
-        for name, module in parent.named_modules():
-            if hasattr(module, "causal_cached"):
-                module.causal_cached = deque()
+        per_parent = self._module_state_lists()["causal_cached"]
+        modules = per_parent.get(id(parent))
+        if modules is None:
+            modules = [m for m in parent.modules() if hasattr(m, "causal_cached")]
+            per_parent[id(parent)] = modules
+        for module in modules:
+            module.causal_cached = deque()
 
     def _set_causal_cached(self, enable_cached=True):
-        for name, module in self.named_modules():
-            if hasattr(module, "enable_cached"):
-                module.enable_cached = enable_cached
+        for module in self._module_state_lists()["enable_cached"]:
+            module.enable_cached = enable_cached
 
     def _set_cache_offset(self, modules, cache_offset=0):
+        # Only called at construction time, so the full walk is fine here.
         for module in modules:
             for submodule in module.modules():
                 if hasattr(submodule, "cache_offset"):
                     submodule.cache_offset = cache_offset
 
     def _set_first_chunk(self, is_first_chunk=True):
-        for module in self.modules():
-            if hasattr(module, "is_first_chunk"):
-                module.is_first_chunk = is_first_chunk
+        for module in self._module_state_lists()["is_first_chunk"]:
+            module.is_first_chunk = is_first_chunk
 
     def build_chunk_start_end(self, t, decoder_mode=False):
-        start_end = [[0, 1]]
-        start = 1
-        end = start
-        while True:
-            if start >= t:
-                break
-            end = min(t, end + (self.t_chunk_dec if decoder_mode else self.t_chunk_enc))
-            start_end.append([start, end])
-            start = end
-        return start_end
+        chunk = self.t_chunk_dec if decoder_mode else self.t_chunk_enc
+        # Closed form of the old while-loop: frame 0 alone, then full
+        # chunks from 1 with the last one clipped to t.
+        return [[0, 1]] + [[s, min(s + chunk, t)] for s in range(1, t, chunk)]
+
+    def _chunk_plan(self, t, decoder_mode=False):
+        chunk = self.t_chunk_dec if decoder_mode else self.t_chunk_enc
+        key = (t, chunk, decoder_mode)
+        plan = self._chunk_plan_cache.get(key)
+        if plan is None:
+            plan = self.build_chunk_start_end(t, decoder_mode=decoder_mode)
+            self._chunk_plan_cache[key] = plan
+        return plan
 
     def encode(self, x):
         self._empty_causal_cached(self.encoder)
         self._set_first_chunk(True)
 
-        if self.use_tiling:
-            h = self.tile_encode(x)
-            l1, l2 = None, None
-        else:
-            h, (l1, l2) = self.encoder(x)
-            if self.use_quant_layer:
-                h = self.quant_conv(h)
+        if x.is_cuda:
+            x = x.contiguous(memory_format=torch.channels_last_3d)
+
+        with self._autocast_context(x):
+            if self.use_tiling:
+                h = self.tile_encode(x)
+                l1, l2 = None, None
+            else:
+                h, (l1, l2) = self.encoder(x)
+                if self.use_quant_layer:
+                    h = self.quant_conv(h)
 
-        posterior = DiagonalGaussianDistribution(h)
+        # Mean/logvar need FP32 range regardless of the autocast dtype.
+        posterior = DiagonalGaussianDistribution(h.float())
         return AutoencoderKLOutput(latent_dist=posterior, extra_output=(l1, l2))
 
     def _auto_select_t_chunk(self):
@@ -491,27 +620,34 @@ class WFVAEModel(VideoBaseAE):
         dec_t_chunk = 2
         enc_t_chunk = t_compess_rate
 
+        # Closed form of repeated (T - 1) // 2 + 1: level k has
+        # ((T - 1) >> k) + 1 frames. Loop invariant, so computed once.
+        T_list = [((temporal_size - 1) >> k) + 1 for k in range(downsample_times + 1)]
+
         # If chunk too large, disable tiling inference.
         success_auto_select = False
         while dec_t_chunk < temporal_size and enc_t_chunk < temporal_size:
-            T_list = [temporal_size]
-            for i in range(downsample_times):
-                T_list.append((T_list[-1] - 1) // 2 + 1)
-
             # Judge if decoder chunk is valid.
             if (T_list[-1] - 1) % dec_t_chunk == 1:
                 dec_t_chunk *= 2
                 continue
 
-            # Judge if encoder chunk is valid.
+            # Judge if encoder chunk is valid. Doubling the chunk has to
+            # restart the whole validation (a bare continue here would only
+            # skip one level and fall through to success).
+            enc_chunk_valid = True
             for inner_T in T_list[:-1]:
                 if (inner_T - 1) % 2 != 0:
                     enc_t_chunk *= 2
-                    continue
+                    enc_chunk_valid = False
+                    break
 
                 if (inner_T - 1) % enc_t_chunk == 1 and (inner_T - 1) / enc_t_chunk > 1:
                     enc_t_chunk *= 2
-                    continue
+                    enc_chunk_valid = False
+                    break
+            if not enc_chunk_valid:
+                continue
 
             success_auto_select = True
             break
@@ -536,7 +672,7 @@ class WFVAEModel(VideoBaseAE):
                 "Input temporal size is not consistent with the temporal size of the model."
             )
         
-        start_end = self.build_chunk_start_end(t)
+        start_end = self._chunk_plan(t)
         result = []
         for idx, (start, end) in enumerate(start_end):
             self._set_first_chunk(idx == 0)
@@ -551,14 +687,18 @@ class WFVAEModel(VideoBaseAE):
     def decode(self, z):
         self._empty_causal_cached(self.decoder)
         self._set_first_chunk(True)
-        
-        if self.use_tiling:
-            dec = self.tile_decode(z)
-            l1, l2 = None, None
-        else:
-            if self.use_quant_layer:
-                z = self.post_quant_conv(z)
-            dec, (l1, l2) = self.decoder(z)
+
+        if z.is_cuda:
+            z = z.contiguous(memory_format=torch.channels_last_3d)
+
+        with self._autocast_context(z):
+            if self.use_tiling:
+                dec = self.tile_decode(z)
+                l1, l2 = None, None
+            else:
+                if self.use_quant_layer:
+                    z = self.post_quant_conv(z)
+                dec, (l1, l2) = self.decoder(z)
 
         return DecoderOutput(sample=dec, extra_output=(l1, l2))
 
@@ -576,9 +716,13 @@ class WFVAEModel(VideoBaseAE):
                 "Input temporal size is not consistent with the temporal size of the model."
             )
         
-        start_end = self.build_chunk_start_end(t_latent, decoder_mode=True)
-        
-        result = []
+        start_end = self._chunk_plan(t_latent, decoder_mode=True)
+
+        # Chunks are written straight into the final buffer instead of being
+        # collected for a torch.cat, so peak memory stays ~1x the output.
+        # Allocated lazily since channels/size/dtype come from the decoder.
+        out = None
+        cursor = 0
         for idx, (start, end) in enumerate(start_end):
             self._set_first_chunk(idx == 0)
 
@@ -592,14 +736,15 @@ class WFVAEModel(VideoBaseAE):
             chunk = self.decoder(chunk)[0]
             if idx != 0 and end + 1 < t_latent:
                 chunk = chunk[:, :, : -self.temporal_uptimes]
-                result.append(chunk.clone())
-            else:
-                result.append(chunk.clone())
 
-        for chunk in result:
-            print(chunk.shape)
-            
-        return torch.cat(result, dim=2)
+            if out is None:
+                b_out, c_out, _, h_out, w_out = chunk.shape
+                out = chunk.new_empty((b_out, c_out, t_upsampled, h_out, w_out))
+            chunk_t = chunk.shape[2]
+            out[:, :, cursor : cursor + chunk_t].copy_(chunk)
+            cursor += chunk_t
+
+        return out
 
     def forward(self, input, sample_posterior=True):
         encode_output = self.encode(input)
@@ -627,6 +772,29 @@ class WFVAEModel(VideoBaseAE):
         else:
             return self.decoder.conv_out.weight
 
+    def _autocast_context(self, x):
+        if self.inference_dtype is not None and not self.training and x.is_cuda:
+            return torch.amp.autocast("cuda", dtype=self.inference_dtype)
+        return contextlib.nullcontext()
+
+    def enable_inference_autocast(self, dtype=torch.bfloat16):
+        # Run encode/decode under autocast at inference time. init_from_ckpt
+        # still loads FP32 master weights; autocast downcasts per-op.
+        self.inference_dtype = dtype
+
+    def disable_inference_autocast(self):
+        self.inference_dtype = None
+
+    def enable_gradient_checkpointing(self, enable: bool = True):
+        # Recompute each resblock's activations in backward instead of
+        # keeping them; only takes effect in training mode.
+        for module in self.modules():
+            if hasattr(module, "gradient_checkpointing"):
+                module.gradient_checkpointing = enable
+
+    def disable_gradient_checkpointing(self):
+        self.enable_gradient_checkpointing(False)
+
     def enable_tiling(self, use_tiling: bool = True):
         self.use_tiling = use_tiling
         self._set_causal_cached(use_tiling)
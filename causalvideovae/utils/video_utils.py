@@ -2,10 +2,9 @@ import torch
 import numpy as np
 import numpy.typing as npt
 import cv2
-from decord import VideoReader, cpu
+import decord
+from decord import VideoReader, cpu, gpu
 from torch.nn import functional as F
-from torchvision.transforms import Lambda, Compose
-from torchvision.transforms._transforms_video import CenterCropVideo
 
 def array_to_video(
     image_array: npt.NDArray, fps: float = 30.0, output_file: str = "output_video.mp4"
@@ -15,25 +14,34 @@ def array_to_video(
     fourcc = cv2.VideoWriter_fourcc(*"mp4v")
     video_writer = cv2.VideoWriter(output_file, fourcc, float(fps), (width, height))
 
+    # One vectorized RGB->BGR swap for the whole clip instead of a
+    # cv2.cvtColor call per frame; the write loop stays because the
+    # VideoWriter API is per-frame.
+    image_array = np.ascontiguousarray(image_array[..., ::-1])
     for image in image_array:
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-        video_writer.write(image_rgb)
+        video_writer.write(image)
 
     video_writer.release()
 
 def custom_to_video(
     x: torch.Tensor, fps: float = 2.0, output_file: str = "output_video.mp4"
 ) -> None:
-    x = x.detach().cpu()
-    x = torch.clamp(x, -1, 1)
-    x = (x + 1) / 2
-    x = x.permute(1, 2, 3, 0).float().numpy()
-    x = (255 * x).astype(np.uint8)
+    # Clamp/scale/cast on the source device and transfer uint8, so no
+    # full-precision numpy intermediate is materialized on the host.
+    x = x.detach().clamp(-1, 1).add_(1).mul_(127.5)
+    x = x.permute(1, 2, 3, 0).to(torch.uint8).cpu().numpy()
     array_to_video(x, fps=fps, output_file=output_file)
     return
 
 def read_video(video_path: str, num_frames: int, sample_rate: int) -> torch.Tensor:
-    decord_vr = VideoReader(video_path, ctx=cpu(0), num_threads=8)
+    # Decode straight into torch tensors (on the GPU when decord is built
+    # with NVDEC) instead of round-tripping uint8 frames through numpy.
+    try:
+        ctx = gpu(0) if torch.cuda.is_available() else cpu(0)
+        decord_vr = VideoReader(video_path, ctx=ctx, num_threads=8)
+    except decord.DECORDError:
+        # CPU fallback for decord builds without GPU decode support.
+        decord_vr = VideoReader(video_path, ctx=cpu(0), num_threads=8)
     total_frames = len(decord_vr)
     sample_frames_len = sample_rate * num_frames
 
@@ -52,8 +60,10 @@ def read_video(video_path: str, num_frames: int, sample_rate: int) -> torch.Tens
         )
 
     frame_id_list = np.linspace(s, e - 1, num_frames, dtype=int)
-    video_data = decord_vr.get_batch(frame_id_list).asnumpy()
-    video_data = torch.from_numpy(video_data)
+    # Scoped torch bridge: the global bridge stays NDArray for the dataset
+    # decoders that still call .asnumpy() on get_batch results.
+    with decord.bridge.use_torch():
+        video_data = decord_vr.get_batch(frame_id_list)
     video_data = video_data.permute(3, 0, 1, 2)  # (T, H, W, C) -> (C, T, H, W)
     return video_data
 
@@ -80,20 +90,26 @@ def video_resize(x, resolution):
     resized_x = F.interpolate(x, size=(new_height, new_width), mode='bilinear', align_corners=True, antialias=True)
     return resized_x
 
+def center_crop_video(x, crop_size):
+    th, tw = (crop_size, crop_size) if isinstance(crop_size, int) else crop_size
+    h, w = x.shape[-2:]
+    i = int(round((h - th) / 2.0))
+    j = int(round((w - tw) / 2.0))
+    return x[..., i : i + th, j : j + tw]
+
 def video_preprocess(video_data, short_size=128, crop_size=None):
-    transform = Compose(
-        [ 
-            Lambda(lambda x: ((x / 255.0) * 2 - 1)),
-            
-            Lambda(lambda x: video_resize(x, short_size)),
-            (
-                CenterCropVideo(crop_size=crop_size)
-                if crop_size is not None
-                else Lambda(lambda x: x)
-            ),
-        ]
-        
+    device = video_data.device
+    if device.type != "cuda" and torch.cuda.is_available():
+        device = torch.device("cuda")
+
+    # One copy onto the device, then normalize to [-1, 1] in place;
+    # x / 127.5 - 1 is the old (x / 255) * 2 - 1.
+    video_data = video_data.to(
+        device, dtype=torch.float32, non_blocking=True, copy=True
     )
-    video_outputs = transform(video_data)
-    # video_outputs = _format_video_shape(video_outputs)
-    return video_outputs
\ No newline at end of file
+    video_data = video_data.div_(127.5).sub_(1.0)
+
+    video_data = video_resize(video_data, short_size)
+    if crop_size is not None:
+        video_data = center_crop_video(video_data, crop_size)
+    return video_data
\ No newline at end of file